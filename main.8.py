@@ -1,15 +1,79 @@
+import os
 import sys
 import json
+import math
+import time
 import datetime
-import random
+import functools
 import requests
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
     QPushButton, QStackedWidget, QCalendarWidget
 )
-from PyQt5.QtCore import Qt, QTimer, QPoint
-from PyQt5.QtGui import QFont, QPainter, QPen, QColor
+from PyQt5.QtCore import (
+    Qt, QTimer, QPoint, QPointF, QLineF, QRect, QRectF, QSize, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+from PyQt5.QtGui import (
+    QFont, QFontMetrics, QPainter, QPen, QColor, QImage, QPixmap, QTransform
+)
+
+
+# Last good weather response, used until a refresh succeeds
+WEATHER_CACHE = os.path.join(
+    os.path.expanduser("~"), ".cache", "razzi-clock", "weather.json"
+)
+WEATHER_CACHE_MAX_AGE = 3600  # seconds
+
+# One shared timer drives everything; slower jobs go by the wall clock,
+# since Qt drops timeouts when a frame overruns
+FRAME_MS = 33
+WEATHER_REFRESH_S = 600
+
+# (connect, read) seconds, so a dead server can't hang a request forever
+HTTP_TIMEOUT = (3, 5)
+
+
+# ============================================================
+# Background JSON fetch (weather now, other feeds later)
+# ============================================================
+class FetchSignals(QObject):
+    loaded = pyqtSignal(dict, object)  # JSON body, response headers
+    not_modified = pyqtSignal()
+    failed = pyqtSignal(str)
+    timed_out = pyqtSignal()
+
+
+class FetchJob(QRunnable):
+    """Runs an HTTP GET on a worker thread and reports back via signals."""
+
+    def __init__(self, session, url, headers=None):
+        super().__init__()
+        self.session = session
+        self.url = url
+        self.headers = headers or {}
+        self.signals = FetchSignals()
+
+    def run(self):
+        try:
+            resp = self.session.get(self.url, headers=self.headers, timeout=HTTP_TIMEOUT)
+            if resp.status_code == 304:
+                self.signals.not_modified.emit()
+                return
+            data = resp.json()
+        except requests.Timeout:
+            self.signals.timed_out.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.loaded.emit(data, resp.headers)
 
 
 # ============================================================
@@ -20,66 +84,159 @@ class MatrixBackground(QWidget):
         super().__init__(parent)
         self.setAttribute(Qt.WA_TransparentForMouseEvents)
         self.setStyleSheet("background: transparent;")
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update)
         self.running = True
-        self.timer.start(50)
+
+        # While running, paintEvent overwrites every dirty pixel itself, so
+        # Qt can skip painting the page background underneath first
+        self.setAttribute(Qt.WA_OpaquePaintEvent, self.running)
 
         self.chars = [chr(i) for i in range(33, 127)]
-        self.columns = []
+        self.font_size = 12
+        self.glyph_font = QFont('Consolas', self.font_size)
+
+        metrics = QFontMetrics(self.glyph_font)
+        self.glyph_ascent = metrics.ascent()
+        self.glyph_size = QSize(max(self.font_size, metrics.maxWidth()), metrics.height())
+        self.atlas = self.build_atlas()
+        w, h = self.glyph_size.width(), self.glyph_size.height()
+        self.glyph_sources = [QRect(i * w, 0, w, h) for i in range(len(self.chars))]
+
+        self.rng = np.random.default_rng()
+
+        self.columns = np.zeros(0, dtype=np.int32)
+        self.picks = np.zeros(0, dtype=np.int32)
         self.init_columns()
 
+    def build_atlas(self):
+        # Render every glyph once, side by side; frames then just blit pixels
+        w, h = self.glyph_size.width(), self.glyph_size.height()
+        atlas = QImage(w * len(self.chars), h, QImage.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.transparent)
+
+        painter = QPainter(atlas)
+        painter.setFont(self.glyph_font)
+        painter.setPen(QColor(0, 255, 0))
+        for i, char in enumerate(self.chars):
+            painter.drawText(QPoint(i * w, self.glyph_ascent), char)
+        painter.end()
+        return atlas
+
     def init_columns(self):
-        width = self.width() or 400
-        font_size = 12
-        self.columns = [random.randint(0, 20) for _ in range(width // font_size)]
-        self.font_size = font_size
+        n = max(1, (self.width() or 400) // self.font_size)
+        if n == self.columns.size:
+            return  # height-only resize; keep the running columns
+        self.columns = self.rng.integers(0, 21, n, dtype=np.int32)
+        self.picks = self.rng.integers(0, len(self.chars), n, dtype=np.int32)
 
     def resizeEvent(self, event):
         self.init_columns()
         super().resizeEvent(event)
 
+    def cell_rect(self, i, row):
+        # Box around a glyph drawn with its baseline at row * font_size
+        top = row * self.font_size - self.glyph_ascent
+        return QRect(QPoint(i * self.font_size, top), self.glyph_size)
+
+    def advance(self):
+        n = self.columns.size
+        # Advance every column, restarting some of those that fell off the bottom
+        reset = (self.columns * self.font_size > self.height()) & (self.rng.random(n) > 0.975)
+        self.columns += 1
+        self.columns[reset] = 0
+        self.picks = self.rng.integers(0, len(self.chars), n, dtype=np.int32)
+
+    def step(self):
+        # Only invalidate the cells that change: this frame's glyph and the next one
+        update, cell_rect = self.update, self.cell_rect
+        for i, row in enumerate(self.columns.tolist()):
+            update(cell_rect(i, row))
+        self.advance()
+        for i, row in enumerate(self.columns.tolist()):
+            update(cell_rect(i, row))
+
     def paintEvent(self, event):
+        # Draw only; animation state is advanced by step()
         if not self.running:
             return
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(0, 0, 0, 200))  # semi-transparent
-        painter.setFont(QFont('Consolas', self.font_size))
-        painter.setPen(QColor(0, 255, 0))
 
-        for i, col in enumerate(self.columns):
-            char = random.choice(self.chars)
-            x = i * self.font_size
-            y = col * self.font_size
-            painter.drawText(QPoint(x, y), char)
-            if col * self.font_size > self.height() and random.random() > 0.975:
-                self.columns[i] = 0
-            else:
-                self.columns[i] += 1
+        # Straight overwrite of the dirty area only, no alpha blending
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(event.rect(), QColor(0, 0, 0))
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        # Local names keep attribute lookups out of the per-column loop
+        draw_image, atlas, sources = painter.drawImage, self.atlas, self.glyph_sources
+        intersects, cell_rect = event.region().intersects, self.cell_rect
+        for i, (col, idx) in enumerate(zip(self.columns.tolist(), self.picks.tolist())):
+            cell = cell_rect(i, col)
+            if intersects(cell):
+                draw_image(cell.topLeft(), atlas, sources[idx])
 
     def toggle(self):
         self.running = not self.running
+        self.setAttribute(Qt.WA_OpaquePaintEvent, self.running)
         self.update()
 
 
 # ============================================================
 # Analog Clock Widget
 # ============================================================
+def dial_point(angle, length):
+    """Point `length` from the dial centre at `angle` degrees clockwise from 12."""
+    rad = math.radians(angle)
+    return QPointF(math.sin(rad) * length, -math.cos(rad) * length)
+
+
 class AnalogClock(QWidget):
+    # Hand and mark endpoints in dial coordinates, computed once
+    TICK_LINES = [QLineF(dial_point(30 * i, 120), dial_point(30 * i, 135)) for i in range(12)]
+    MINUTE_HANDS = [QLineF(QPointF(0, 0), dial_point(6 * i, 100)) for i in range(60)]
+    SECOND_HANDS = [QLineF(dial_point(6 * i, -10), dial_point(6 * i, 120)) for i in range(60)]
+
     def __init__(self):
         super().__init__()
         self.setMinimumSize(400, 400)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update)
-        self.timer.start(1000)
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        # Face, marks, hour and minute hands only change once a minute
+        self._dial_cache = None
+        self._cache_key = None
+        self._second = None
+        self._now = None  # time of the last tick, shared by tick and paint
+
+    def showEvent(self, event):
+        self._now = None
+        super().showEvent(event)
 
+    def dial_transform(self):
         side = min(self.width(), self.height())
-        painter.translate(self.width() / 2, self.height() / 2)
-        painter.scale(side / 300.0, side / 300.0)
+        transform = QTransform()
+        transform.translate(self.width() / 2, self.height() / 2)
+        transform.scale(side / 300.0, side / 300.0)
+        return transform
+
+    def second_hand_rect(self, second):
+        hand = self.dial_transform().map(self.SECOND_HANDS[second])
+        bounds = QRectF(hand.p1(), hand.p2()).normalized()
+        return bounds.toAlignedRect().adjusted(-4, -4, 4, 4)
+
+    def tick(self):
+        now = self._now = datetime.datetime.now()
+        if self._cache_key != (self.size(), now.hour, now.minute) or self._second is None:
+            self.update()
+            return
+        self.update(self.second_hand_rect(self._second))
+        self.update(self.second_hand_rect(now.second))
+
+    def render_dial(self, now):
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * dpr)
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setTransform(self.dial_transform())
 
         # Face
         painter.setPen(Qt.NoPen)
@@ -88,33 +245,36 @@ class AnalogClock(QWidget):
 
         # Hour / minute marks
         painter.setPen(QPen(QColor("white"), 3))
-        for i in range(12):
-            painter.drawLine(0, -120, 0, -135)
-            painter.rotate(30)
-
-        # Hands
-        now = datetime.datetime.now()
+        painter.drawLines(self.TICK_LINES)
 
         # Hour hand
-        painter.save()
-        painter.rotate(30 * ((now.hour % 12) + now.minute / 60))
+        hour_angle = 30 * ((now.hour % 12) + now.minute / 60)
         painter.setPen(QPen(QColor("#00aaff"), 6))
-        painter.drawLine(0, 0, 0, -70)
-        painter.restore()
+        painter.drawLine(QLineF(QPointF(0, 0), dial_point(hour_angle, 70)))
 
         # Minute hand
-        painter.save()
-        painter.rotate(6 * (now.minute + now.second / 60))
         painter.setPen(QPen(QColor("white"), 4))
-        painter.drawLine(0, 0, 0, -100)
-        painter.restore()
+        painter.drawLine(self.MINUTE_HANDS[now.minute])
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        now = self._now or datetime.datetime.now()
+        key = (self.size(), now.hour, now.minute)
+        if self._cache_key != key:
+            self._dial_cache = self.render_dial(now)
+            self._cache_key = key
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._dial_cache)
 
         # Second hand
-        painter.save()
-        painter.rotate(6 * now.second)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setTransform(self.dial_transform())
         painter.setPen(QPen(QColor("red"), 2))
-        painter.drawLine(0, 10, 0, -120)
-        painter.restore()
+        painter.drawLine(self.SECOND_HANDS[now.second])
+        self._second = now.second
 
 
 # ============================================================
@@ -126,8 +286,29 @@ class Dashboard(QWidget):
         self.setWindowTitle("Smart Dashboard")
         self.setStyleSheet(self.dark_mode())
 
-        # Weather data
-        self.api_key, self.location = self.load_weather_key()
+        # Collapses a burst of resize events into one matrix re-layout
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.apply_matrix_geometry)
+
+        # Weather data (Wapi.json is read on first fetch, not here)
+        self._weather_job = None
+        self._weather_shown = False
+        self._weather_reading = None  # last good (temp_f, condition)
+        self._weather_ts = 0  # when that reading was fetched
+        self._weather_etag = None
+        self._weather_lastmod = None
+
+        # Shared by every network feed so they can run side by side
+        self.io_pool = QThreadPool(self)
+        self.io_pool.setMaxThreadCount(4)
+
+        # Keep-alive connections so refreshes skip the TCP/TLS handshake
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.io_pool.maxThreadCount()
+        )
+        self.http.mount("https://", adapter)
 
         # Stack
         self.stack = QStackedWidget()
@@ -139,6 +320,7 @@ class Dashboard(QWidget):
         self.stack.addWidget(self.main_screen)
         self.stack.addWidget(self.weather_screen)
         self.stack.addWidget(self.calendar_screen)
+        self.stack.currentChanged.connect(self.on_screen_change)
 
         layout = QVBoxLayout()
         layout.addWidget(self.stack)
@@ -146,7 +328,8 @@ class Dashboard(QWidget):
 
         # Update systems
         self.update_clock()
-        self.update_weather()
+        self.load_weather_cache()
+        QTimer.singleShot(0, self.update_weather)  # after the window is up
         self.start_timers()
 
     # ------------------------------------------------------------
@@ -174,14 +357,53 @@ class Dashboard(QWidget):
     # ------------------------------------------------------------
     # Load Weather API Key
     # ------------------------------------------------------------
-    def load_weather_key(self):
+    @functools.cached_property
+    def weather_key(self):
         try:
-            with open("Wapi.json", "r") as f:
-                data = json.load(f)
-                return data["api_key"], data["location"]
-        except:
+            with open("Wapi.json", "rb") as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
+            return data["api_key"], data["location"]
+        except (OSError, ValueError, KeyError, TypeError):
             return None, None
 
+    # ------------------------------------------------------------
+    # Weather disk cache
+    # ------------------------------------------------------------
+    def read_weather_cache(self):
+        try:
+            with open(WEATHER_CACHE, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - cached.get("ts", 0) > WEATHER_CACHE_MAX_AGE:
+            return None
+        return cached
+
+    def load_weather_cache(self):
+        cached = self.read_weather_cache()
+        if cached is None:
+            return False
+        self._weather_etag = cached.get("etag")
+        self._weather_lastmod = cached.get("last_modified")
+        self.set_weather(cached["temp_f"], cached["condition"], cached["ts"])
+        return True
+
+    def save_weather_cache(self, temp_f, condition):
+        try:
+            os.makedirs(os.path.dirname(WEATHER_CACHE), exist_ok=True)
+            with open(WEATHER_CACHE, "w") as f:
+                json.dump({
+                    "temp_f": temp_f,
+                    "condition": condition,
+                    "etag": self._weather_etag,
+                    "last_modified": self._weather_lastmod,
+                    "ts": time.time(),
+                }, f)
+        except OSError:
+            pass
+
     # ------------------------------------------------------------
     # Main Screen
     # ------------------------------------------------------------
@@ -313,6 +535,14 @@ class Dashboard(QWidget):
     def show_calendar(self):
         self.stack.setCurrentIndex(2)
 
+    def on_screen_change(self, index):
+        # The matrix only exists for the main screen; park it everywhere else
+        active = index == 0
+        if active:
+            self.apply_matrix_geometry()
+        self.matrix_bg.setVisible(active)
+        self.update_tick_rate()
+
     # ------------------------------------------------------------
     # Update clock + date
     # ------------------------------------------------------------
@@ -324,47 +554,149 @@ class Dashboard(QWidget):
     # Weather fetch
     # ------------------------------------------------------------
     def update_weather(self):
-        if not self.api_key:
+        api_key, location = self.weather_key
+        if not api_key:
             self.temp_btn.setText("No API")
             return
 
-        try:
-            url = f"http://api.weatherapi.com/v1/current.json?key={self.api_key}&q={self.location}"
-            r = requests.get(url).json()
+        # Previous request still in flight
+        if self._weather_job is not None:
+            return
 
+        # Conditional GET: an unchanged reading comes back as an empty 304
+        headers = {}
+        if self._weather_etag:
+            headers["If-None-Match"] = self._weather_etag
+        if self._weather_lastmod:
+            headers["If-Modified-Since"] = self._weather_lastmod
+
+        url = f"https://api.weatherapi.com/v1/current.json?key={api_key}&q={location}"
+        job = FetchJob(self.http, url, headers)
+        job.signals.loaded.connect(self.on_weather_loaded)
+        job.signals.not_modified.connect(self.on_weather_not_modified)
+        job.signals.failed.connect(self.on_weather_failed)
+        job.signals.timed_out.connect(self.on_weather_timeout)
+        self._weather_job = job
+        self.io_pool.start(job)
+
+    def on_weather_loaded(self, r, headers):
+        self._weather_job = None
+        try:
             temp_f = r["current"]["temp_f"]
             condition = r["current"]["condition"]["text"]
+        except (KeyError, TypeError):
+            self.on_weather_failed("unexpected response")
+            return
 
-            self.temp_btn.setText(f"{temp_f}°F")
-            self.weather_info.setText(
-                f"Temperature: {temp_f}°F\nCondition: {condition}"
-            )
+        self._weather_etag = headers.get("ETag")
+        self._weather_lastmod = headers.get("Last-Modified")
+        self.set_weather(temp_f, condition)
+        self.save_weather_cache(temp_f, condition)
+
+    def on_weather_not_modified(self):
+        self._weather_job = None
+        if self._weather_reading is None:
+            # Nothing to revalidate against; fetch the reading unconditionally
+            self._weather_etag = self._weather_lastmod = None
+            self.update_weather()
+            return
 
-        except Exception as e:
-            self.temp_btn.setText("Err")
-            self.weather_info.setText("Weather load error")
+        # Reading is still current: keep it and extend its lifetime
+        self._weather_ts = time.time()
+        if not self._weather_shown:
+            self.set_weather(*self._weather_reading, self._weather_ts)
+        self.save_weather_cache(*self._weather_reading)
+
+    def on_weather_failed(self, error):
+        self._weather_job = None
+
+        # Keep showing the last good reading while it is recent enough,
+        # from memory first and from the disk cache after a restart
+        if self.weather_reading_fresh():
+            if not self._weather_shown:
+                self.set_weather(*self._weather_reading, self._weather_ts)
+            return
+        if self.load_weather_cache():
+            return
+        self.temp_btn.setText("Err")
+        self.weather_info.setText("Weather load error")
+        self._weather_shown = False
+        self._weather_etag = None
+        self._weather_lastmod = None
+
+    def on_weather_timeout(self):
+        # Likely transient: leave a recent reading up and retry next refresh
+        if self._weather_shown and self.weather_reading_fresh():
+            self._weather_job = None
+            return
+        self.on_weather_failed("timeout")
+
+    def weather_reading_fresh(self):
+        return (
+            self._weather_reading is not None
+            and time.time() - self._weather_ts <= WEATHER_CACHE_MAX_AGE
+        )
+
+    def set_weather(self, temp_f, condition, ts=None):
+        self._weather_shown = True
+        self._weather_reading = (temp_f, condition)
+        self._weather_ts = time.time() if ts is None else ts
+        self.temp_btn.setText(f"{temp_f}°F")
+        self.weather_info.setText(
+            f"Temperature: {temp_f}°F\nCondition: {condition}"
+        )
 
     # ------------------------------------------------------------
     # Timers
     # ------------------------------------------------------------
     def start_timers(self):
-        # Clock
-        clock_timer = QTimer()
-        clock_timer.timeout.connect(self.update_clock)
-        clock_timer.start(1000)
-        self.clock_timer = clock_timer
-
-        # Weather refresh (every 10 minutes)
-        weather_timer = QTimer()
-        weather_timer.timeout.connect(self.update_weather)
-        weather_timer.start(600000)
-        self.weather_timer = weather_timer
+        self._last_second = None
+        self._last_weather = time.monotonic()  # first fetch is queued in __init__
+        master = QTimer(self)
+        master.timeout.connect(self.on_tick)
+        self.master_timer = master
+        self.update_tick_rate()
+
+    def matrix_animating(self):
+        return self.matrix_bg.running and self.stack.currentIndex() == 0
+
+    def update_tick_rate(self):
+        # Frame rate only while the matrix animates; otherwise once a second,
+        # aimed just past the next second boundary so none is skipped
+        if self.matrix_animating():
+            self.master_timer.start(FRAME_MS)
+        else:
+            self.master_timer.start(1000 - int(time.time() * 1000) % 1000 + 5)
+
+    def on_tick(self):
+        # Matrix frame (skipped while off or on another screen)
+        if self.matrix_bg.running and self.matrix_bg.isVisible():
+            self.matrix_bg.step()
+
+        # Clock + date, whenever the wall-clock second changes
+        second = int(time.time())
+        if second != self._last_second:
+            self._last_second = second
+            if self.clock_widget.isVisible():
+                self.clock_widget.tick()
+            self.update_clock()
+
+        # Weather refresh
+        now = time.monotonic()
+        if now - self._last_weather >= WEATHER_REFRESH_S:
+            self._last_weather = now
+            self.update_weather()
+
+        # At the idle cadence, re-aim at the next second each time
+        if not self.matrix_animating():
+            self.update_tick_rate()
 
     # ------------------------------------------------------------
     # Matrix toggle
     # ------------------------------------------------------------
     def toggle_matrix(self):
         self.matrix_bg.toggle()
+        self.update_tick_rate()
         if self.matrix_bg.running:
             self.matrix_btn.setText("Matrix ON")
         else:
@@ -374,9 +706,14 @@ class Dashboard(QWidget):
     # Resize matrix on window resize
     # ------------------------------------------------------------
     def resizeEvent(self, event):
-        self.matrix_bg.setGeometry(self.main_screen.rect())
+        self._resize_timer.start(0)
         super().resizeEvent(event)
 
+    def apply_matrix_geometry(self):
+        # Off-screen matrix catches up in on_screen_change
+        if self.stack.currentIndex() == 0:
+            self.matrix_bg.setGeometry(self.main_screen.rect())
+
 
 # ============================================================
 # Run App